@@ -0,0 +1,822 @@
+"""Speech-to-Text (STT) input utilities.
+
+This module provides optional STT using the `speech_recognition` package.
+If not installed, functions fail gracefully.
+
+Exports:
+- is_stt_available() -> bool
+- list_microphones() -> list[dict]
+- set_stt_config(...)
+- recognize_once(...) -> Optional[str]
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+from typing import Tuple
+from collections import deque
+from queue import Empty
+import os
+import threading
+import time
+import warnings
+
+# Global STT settings
+STT_ENABLED: bool = True
+STT_ENGINE: str = "faster-whisper"  # INT8 CTranslate2 Whisper by default; fallback if unavailable
+STT_MIC_INDEX: Optional[int] = None  # default system mic when None
+STT_LANGUAGE: str = "en-US"  # used by online recognizers (e.g., Google)
+STT_ENERGY_THRESHOLD: Optional[int] = None  # static energy threshold when set
+STT_DYNAMIC_ENERGY: bool = True  # let recognizer auto-adjust if True
+STT_ADJUST_DURATION: float = 0.25  # seconds to calibrate ambient noise
+CAPTURE_ENABLED: bool = True  # gate to drop recognitions when disabled
+# Audio capture backend:
+# - "sr": speech_recognition Microphone + listen() (default)
+# - "sounddevice": raw 16 kHz int16 PCM with a numpy energy VAD, fed straight to Whisper
+STT_BACKEND: str = "sr"
+STT_VAD_THRESHOLD: Optional[float] = None  # mean |int16| for speech; None uses STT_ENERGY_THRESHOLD or 300
+STT_VAD_SILENCE: float = 0.8  # seconds of quiet that end a phrase (sounddevice backend)
+_CAPTURE_ENABLED_AT: float = 0.0  # monotonic time capture was last re-enabled
+
+# Whisper settings
+STT_WHISPER_MODEL: str = "base.en"  # tiny.en for English per request
+# Other models:
+# - tiny.en
+# - base.en
+# - small.en
+# - medium.en
+
+STT_WHISPER_DEVICE: Optional[str] = None  # "cpu", "cuda", or None to use CUDA when a GPU is visible
+# faster-whisper weight/compute precision; None picks "int8" on CPU, "int8_float16" on CUDA.
+# Accepted: "int8", "int8_float16", "int8_float32", "int8_bfloat16", "float16", "bfloat16", "float32"
+STT_COMPUTE_TYPE: Optional[str] = None
+# faster-whisper decoding, tuned for short spoken commands
+STT_BEAM_SIZE: int = 1
+STT_VAD_FILTER: bool = True  # CTranslate2's Silero VAD trims silence before decoding
+STT_VAD_MIN_SILENCE_MS: int = 200
+STT_WITHOUT_TIMESTAMPS: bool = True
+STT_CONDITION_ON_PREVIOUS_TEXT: bool = False
+
+# Engines that transcribe with a local Whisper model:
+# - "faster-whisper" / "whisper": CTranslate2 INT8 (falls back to openai-whisper)
+# - "whisper-fp32": openai-whisper (PyTorch FP32), explicit opt-in
+WHISPER_ENGINES = frozenset({"faster-whisper", "whisper", "whisper-fp32"})
+
+# Internal model caches
+_WHISPER_MODEL = None  # type: ignore
+_FASTER_WHISPER_MODEL = None  # type: ignore
+_AUTO_DEVICE: Optional[str] = None  # probed once when STT_WHISPER_DEVICE is None
+
+# Cached speech_recognition module, shared Recognizer, and pocketsphinx probe result
+_SR = None  # type: ignore
+_RECOGNIZER = None  # type: ignore
+_HAS_POCKETSPHINX: Optional[bool] = None
+# Energy threshold from the one-time ambient calibration in recognize_once; None = calibrate next call
+_AMBIENT_ENERGY: Optional[float] = None
+
+_INT16_TO_F32 = 1.0 / 32768.0  # int16 PCM sample -> float32 in [-1, 1]
+# openai-whisper transcribe() defaults for treating a window as silence
+_NO_SPEECH_THRESHOLD = 0.6
+_LOGPROB_THRESHOLD = -1.0
+
+_ENV_INITIALIZED: bool = False
+_STT_AVAILABLE: Optional[bool] = None  # result of the last engine probe; None = probe again
+
+
+def _init_env() -> None:
+	"""Quiet noisy library warnings/logging and progress bars, once, before the first STT use."""
+	global _ENV_INITIALIZED
+	if _ENV_INITIALIZED:
+		return
+	_ENV_INITIALIZED = True
+	os.environ.setdefault("CT2_VERBOSE", "0")  # ctranslate2 verbosity
+	os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
+	os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+	os.environ.setdefault("HF_HUB_DISABLE_SYMLINKS_WARNING", "1")
+	warnings.filterwarnings("ignore", category=UserWarning, module=r"ctranslate2(\..*)?$")
+	warnings.filterwarnings("ignore", category=UserWarning, module=r"faster_whisper(\..*)?$")
+	warnings.filterwarnings("ignore", message=r"The current model is English-only.*")
+
+
+def is_stt_available() -> bool:
+	"""True when the configured engine (or a fallback it switched to) can be imported; cached."""
+	global _STT_AVAILABLE
+	_init_env()
+	if not STT_ENABLED:
+		return False
+	if _STT_AVAILABLE is None:
+		_STT_AVAILABLE = _probe_stt_engine()
+	return _STT_AVAILABLE
+
+
+def _probe_stt_engine() -> bool:
+	global STT_ENGINE
+	try:
+		if STT_ENGINE == "whisper-fp32":
+			import numpy  # noqa: F401
+			import whisper  # type: ignore
+			return True
+		elif STT_ENGINE in WHISPER_ENGINES:
+			import numpy  # noqa: F401
+			from faster_whisper import WhisperModel  # noqa: F401
+			return True
+		else:
+			_get_sr()
+			return True
+	except Exception:
+		# Try faster-whisper, then openai-whisper, before falling back to SR
+		try:
+			import numpy  # noqa: F401
+			from faster_whisper import WhisperModel  # noqa: F401
+			STT_ENGINE = "faster-whisper"
+			return True
+		except Exception:
+			pass
+		try:
+			import numpy  # noqa: F401
+			import whisper  # type: ignore  # noqa: F401
+			STT_ENGINE = "whisper-fp32"
+			return True
+		except Exception:
+			pass
+		try:
+			_get_sr()
+			STT_ENGINE = "sr"
+			return True
+		except Exception:
+			return False
+
+
+def _get_sr():
+	"""Import `speech_recognition` once and return the cached module."""
+	global _SR
+	if _SR is None:
+		import importlib
+		_SR = importlib.import_module('speech_recognition')
+	return _SR
+
+
+def _configure_recognizer(r) -> None:
+	if STT_ENERGY_THRESHOLD is not None:
+		r.energy_threshold = int(STT_ENERGY_THRESHOLD)
+	r.dynamic_energy_threshold = bool(STT_DYNAMIC_ENERGY)
+
+
+def _get_recognizer():
+	"""Return the shared Recognizer, re-synced with the current energy settings."""
+	global _RECOGNIZER
+	if _RECOGNIZER is None:
+		_RECOGNIZER = _get_sr().Recognizer()
+	_configure_recognizer(_RECOGNIZER)
+	return _RECOGNIZER
+
+
+def list_microphones() -> List[Dict[str, Any]]:
+	"""List available microphone devices.
+
+	Returns a list of dicts: { index, name }.
+	"""
+	try:
+		sr = _get_sr()
+		names = sr.Microphone.list_microphone_names() or []
+		return [{"index": i, "name": n} for i, n in enumerate(names)]
+	except Exception:
+		return []
+
+
+def set_stt_config(
+	*,
+	enabled: Optional[bool] = None,
+	engine: Optional[str] = None,
+	mic_index: Optional[int] = None,
+	language: Optional[str] = None,
+	energy_threshold: Optional[int] = None,
+	dynamic_energy: Optional[bool] = None,
+	adjust_duration: Optional[float] = None,
+	whisper_model: Optional[str] = None,
+	whisper_device: Optional[str] = None,
+	compute_type: Optional[str] = None,
+	backend: Optional[str] = None,
+	vad_threshold: Optional[float] = None,
+	vad_silence: Optional[float] = None,
+	beam_size: Optional[int] = None,
+	vad_filter: Optional[bool] = None,
+	vad_min_silence_ms: Optional[int] = None,
+	without_timestamps: Optional[bool] = None,
+	condition_on_previous_text: Optional[bool] = None,
+) -> None:
+	"""Update global STT configuration variables."""
+	global STT_ENABLED, STT_ENGINE, STT_MIC_INDEX, STT_LANGUAGE, STT_ENERGY_THRESHOLD, STT_DYNAMIC_ENERGY, STT_ADJUST_DURATION, STT_WHISPER_MODEL, STT_WHISPER_DEVICE, STT_COMPUTE_TYPE
+	global STT_BACKEND, STT_VAD_THRESHOLD, STT_VAD_SILENCE
+	global STT_BEAM_SIZE, STT_VAD_FILTER, STT_VAD_MIN_SILENCE_MS, STT_WITHOUT_TIMESTAMPS, STT_CONDITION_ON_PREVIOUS_TEXT
+	global _WHISPER_MODEL, _FASTER_WHISPER_MODEL, _AMBIENT_ENERGY, _STT_AVAILABLE
+	if enabled is not None:
+		STT_ENABLED = bool(enabled)
+	if engine is not None:
+		STT_ENGINE = engine
+		_STT_AVAILABLE = None
+	if mic_index is not None:
+		STT_MIC_INDEX = int(mic_index)
+		_AMBIENT_ENERGY = None
+	if language is not None:
+		STT_LANGUAGE = language
+	if energy_threshold is not None:
+		STT_ENERGY_THRESHOLD = int(energy_threshold)
+		_AMBIENT_ENERGY = None
+	if dynamic_energy is not None:
+		STT_DYNAMIC_ENERGY = bool(dynamic_energy)
+	if adjust_duration is not None:
+		STT_ADJUST_DURATION = float(adjust_duration)
+	# Cached models are tied to model/device/precision; drop them when any of those change
+	if whisper_model is not None and str(whisper_model) != STT_WHISPER_MODEL:
+		STT_WHISPER_MODEL = str(whisper_model)
+		_WHISPER_MODEL = _FASTER_WHISPER_MODEL = None
+	if whisper_device is not None:
+		device = None if str(whisper_device) == "auto" else str(whisper_device)
+		if device != STT_WHISPER_DEVICE:
+			STT_WHISPER_DEVICE = device
+			_WHISPER_MODEL = _FASTER_WHISPER_MODEL = None
+	if compute_type is not None and str(compute_type) != STT_COMPUTE_TYPE:
+		STT_COMPUTE_TYPE = str(compute_type)
+		_FASTER_WHISPER_MODEL = None
+	if backend is not None:
+		STT_BACKEND = str(backend)
+	if vad_threshold is not None:
+		STT_VAD_THRESHOLD = float(vad_threshold)
+	if vad_silence is not None:
+		STT_VAD_SILENCE = float(vad_silence)
+	if beam_size is not None:
+		STT_BEAM_SIZE = int(beam_size)
+	if vad_filter is not None:
+		STT_VAD_FILTER = bool(vad_filter)
+	if vad_min_silence_ms is not None:
+		STT_VAD_MIN_SILENCE_MS = int(vad_min_silence_ms)
+	if without_timestamps is not None:
+		STT_WITHOUT_TIMESTAMPS = bool(without_timestamps)
+	if condition_on_previous_text is not None:
+		STT_CONDITION_ON_PREVIOUS_TEXT = bool(condition_on_previous_text)
+
+
+def set_capture_enabled(enabled: bool) -> None:
+	"""Enable/disable pushing recognized text into the queue.
+
+	When disabled, background recognition still runs but results are ignored.
+	"""
+	global CAPTURE_ENABLED, _CAPTURE_ENABLED_AT
+	enabled = bool(enabled)
+	if enabled and not CAPTURE_ENABLED:
+		_CAPTURE_ENABLED_AT = time.monotonic()
+	CAPTURE_ENABLED = enabled
+
+
+def _started_before_capture(recognizer, audio) -> bool:
+	"""True when a phrase began while capture was still disabled (e.g. our own TTS output).
+
+	Callbacks fire after the phrase ends, so the start is estimated from the audio length,
+	less the leading silence SR keeps before speech onset.
+	"""
+	try:
+		duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+	except Exception:
+		return False
+	lead = float(getattr(recognizer, 'non_speaking_duration', 0.0) or 0.0)
+	return time.monotonic() - duration + lead < _CAPTURE_ENABLED_AT
+
+
+def _recognize_with_available_engines(recognizer, audio, *, language: str) -> Optional[str]:
+	"""Try offline (Sphinx) first, then online (Google) if available."""
+	# Offline: PocketSphinx
+	global _HAS_POCKETSPHINX
+	if _HAS_POCKETSPHINX is None:
+		try:
+			import importlib
+			importlib.import_module('pocketsphinx')
+			_HAS_POCKETSPHINX = True
+		except Exception:
+			_HAS_POCKETSPHINX = False
+	if _HAS_POCKETSPHINX:
+		try:
+			return recognizer.recognize_sphinx(audio, language=language)
+		except Exception:
+			pass
+
+	# Online: Google Web Speech API (no key needed, but requires internet)
+	try:
+		return recognizer.recognize_google(audio, language=language)
+	except Exception:
+		return None
+
+
+def _sr_audio_to_float32(audio_obj) -> Optional[Tuple["np.ndarray", int]]:  # type: ignore
+	"""Convert SpeechRecognition.AudioData to float32 numpy array and sample rate.
+
+	Returns tuple (audio_float32, sample_rate) or None on failure.
+	"""
+	try:
+		import numpy as np
+		# The mic is opened at 16 kHz, so audio usually needs no rate/width conversion
+		try:
+			native = audio_obj.sample_rate == 16000 and audio_obj.sample_width == 2
+		except AttributeError:
+			native = False
+		if native:
+			raw = audio_obj.get_raw_data()
+		else:
+			raw = audio_obj.get_raw_data(convert_rate=16000, convert_width=2)
+		# int16 PCM -> float32 [-1, 1], cast and scale fused into one pass
+		i16 = np.frombuffer(raw, dtype=np.int16)
+		out = np.empty(i16.shape, dtype=np.float32)
+		np.multiply(i16, np.float32(_INT16_TO_F32), out=out, casting='unsafe')
+		return out, 16000
+	except Exception:
+		return None
+
+
+def _whisper_language(language: Optional[str]) -> Optional[str]:
+	lang = (language or STT_LANGUAGE)
+	if isinstance(lang, str) and '-' in lang:
+		lang = lang.split('-')[0]
+	return lang
+
+
+def _resolve_device() -> str:
+	"""Return STT_WHISPER_DEVICE, or "cuda"/"cpu" from a one-time GPU probe when it is None."""
+	global _AUTO_DEVICE
+	if STT_WHISPER_DEVICE:
+		return STT_WHISPER_DEVICE
+	if _AUTO_DEVICE is None:
+		_AUTO_DEVICE = "cpu"
+		try:
+			import ctranslate2
+			if ctranslate2.get_cuda_device_count() > 0:
+				_AUTO_DEVICE = "cuda"
+		except Exception:
+			try:
+				import torch
+				if torch.cuda.is_available():
+					_AUTO_DEVICE = "cuda"
+			except Exception:
+				pass
+	return _AUTO_DEVICE
+
+
+def _get_faster_whisper_model():
+	from faster_whisper import WhisperModel
+	global _FASTER_WHISPER_MODEL
+	if _FASTER_WHISPER_MODEL is None:
+		device = _resolve_device()
+		_FASTER_WHISPER_MODEL = WhisperModel(
+			STT_WHISPER_MODEL,
+			device=device,
+			device_index=0,
+			compute_type=STT_COMPUTE_TYPE or ("int8" if device == 'cpu' else "int8_float16"),
+			cpu_threads=os.cpu_count() or 0,
+			num_workers=1,
+		)
+	return _FASTER_WHISPER_MODEL
+
+
+def _faster_whisper_text(audio_arr, *, language: Optional[str], vad_filter: Optional[bool]) -> Optional[str]:
+	use_vad = STT_VAD_FILTER if vad_filter is None else vad_filter
+	segments, info = _get_faster_whisper_model().transcribe(
+		audio_arr,
+		language=_whisper_language(language),
+		beam_size=STT_BEAM_SIZE,
+		vad_filter=use_vad,
+		vad_parameters={"min_silence_duration_ms": STT_VAD_MIN_SILENCE_MS} if use_vad else None,
+		without_timestamps=STT_WITHOUT_TIMESTAMPS,
+		condition_on_previous_text=STT_CONDITION_ON_PREVIOUS_TEXT,
+		temperature=0.0,
+	)
+	# Segments decode lazily, so device errors surface here rather than in transcribe().
+	# Strip and filter each segment once while collecting
+	text = " ".join([t for seg in segments if (t := (getattr(seg, 'text', None) or '').strip())])
+	return text or None
+
+
+def _transcribe_faster_whisper(audio_arr, *, language: Optional[str], vad_filter: Optional[bool] = None) -> Optional[str]:
+	"""Transcribe with faster-whisper (CTranslate2): INT8 on CPU, INT8 weights with FP16 compute on CUDA.
+
+	If an auto-detected GPU fails to load or run the model (missing/broken CUDA libraries),
+	detection is pinned to the CPU and the phrase is retried once there.
+	"""
+	global _AUTO_DEVICE, _FASTER_WHISPER_MODEL
+	try:
+		return _faster_whisper_text(audio_arr, language=language, vad_filter=vad_filter)
+	except Exception:
+		if STT_WHISPER_DEVICE or _AUTO_DEVICE != "cuda":
+			raise
+		_AUTO_DEVICE = "cpu"
+		_FASTER_WHISPER_MODEL = None
+		return _faster_whisper_text(audio_arr, language=language, vad_filter=vad_filter)
+
+
+def _transcribe_openai_whisper(audio_arr, *, language: Optional[str], vad_filter: Optional[bool] = None) -> Optional[str]:
+	"""Transcribe with openai-whisper (PyTorch, FP32 on CPU). It has no VAD, so `vad_filter` is ignored."""
+	import whisper
+	global _WHISPER_MODEL
+	device = _resolve_device()
+	if _WHISPER_MODEL is None:
+		_WHISPER_MODEL = whisper.load_model(STT_WHISPER_MODEL, device=device)
+	fp16 = device != 'cpu'
+	if audio_arr.shape[-1] > whisper.audio.N_SAMPLES:
+		# Longer than one 30 s window: let transcribe() handle the seeking
+		result = _WHISPER_MODEL.transcribe(audio_arr, language=_whisper_language(language), fp16=fp16)
+		text = (result.get('text') or '').strip()
+		return text or None
+	# Single window: decode the mel directly, skipping transcribe()'s sliding-window setup
+	mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio_arr), _WHISPER_MODEL.dims.n_mels, device=_WHISPER_MODEL.device)
+	options = whisper.DecodingOptions(language=_whisper_language(language), fp16=fp16, without_timestamps=True, temperature=0.0)
+	result = whisper.decode(_WHISPER_MODEL, mel, options)
+	# Same silence gate transcribe() applies with its defaults, so noise bursts that pass
+	# the energy check are not returned as hallucinated text ("Thank you.")
+	if result.no_speech_prob > _NO_SPEECH_THRESHOLD and result.avg_logprob < _LOGPROB_THRESHOLD:
+		return None
+	text = (result.text or '').strip()
+	return text or None
+
+
+def _whisper_transcribe_array(audio_arr, sample_rate: int, *, language: Optional[str], vad_filter: Optional[bool] = None) -> Optional[str]:
+	"""Transcribe with faster-whisper (INT8) if available, else openai-whisper.
+
+	STT_ENGINE == "whisper-fp32" reverses the order.
+	"""
+	import numpy as np
+	# No-op for the float32 arrays produced here; otherwise one copy up front instead of per backend
+	audio_arr = np.ascontiguousarray(audio_arr, dtype=np.float32)
+	backends = [_transcribe_faster_whisper, _transcribe_openai_whisper]
+	if STT_ENGINE == "whisper-fp32":
+		backends.reverse()
+	for backend in backends:
+		try:
+			return backend(audio_arr, language=language, vad_filter=vad_filter)
+		except Exception:
+			continue
+	return None
+
+
+def preload_stt_models() -> bool:
+	"""Load the configured STT model(s) at startup to avoid runtime noise and latency."""
+	_init_env()
+	try:
+		# Warm with 3s of quiet noise rather than silence: silence is skipped by VAD and
+		# decodes to nothing, leaving the encoder/decoder kernels cold for the first phrase
+		import numpy as np
+		noise = np.random.default_rng(0).standard_normal(48000).astype(np.float32) * np.float32(0.01)
+		# Warm the chosen engine
+		if STT_ENGINE in WHISPER_ENGINES:
+			_ = _whisper_transcribe_array(noise, 16000, language=STT_LANGUAGE, vad_filter=False)
+			if _FASTER_WHISPER_MODEL is not None:
+				# Prime the mel filterbank path once more on its own
+				_FASTER_WHISPER_MODEL.feature_extractor(noise)
+				if STT_VAD_FILTER:
+					# faster-whisper loads its Silero VAD model lazily on the first VAD pass;
+					# half a second with VAD on loads it now instead of on the first phrase
+					_ = _transcribe_faster_whisper(noise[:8000], language=STT_LANGUAGE, vad_filter=True)
+		return True
+	except Exception:
+		return False
+
+
+_SD_RATE = 16000
+_SD_BLOCK = 1600  # 100 ms blocks
+_SD_PREROLL_BLOCKS = 3  # audio kept from before speech onset
+
+
+def _use_sounddevice() -> bool:
+	"""True when raw sounddevice capture is selected and usable with the current engine."""
+	if STT_BACKEND != "sounddevice" or STT_ENGINE not in WHISPER_ENGINES:
+		return False
+	try:
+		import numpy  # noqa: F401
+		import sounddevice  # noqa: F401
+		return True
+	except Exception:
+		return False
+
+
+def _open_sd_stream(mic_index: Optional[int]):
+	import sounddevice as sd
+	return sd.InputStream(samplerate=_SD_RATE, channels=1, dtype='int16', blocksize=_SD_BLOCK, device=mic_index)
+
+
+def _sd_capture_phrase(
+	stream,
+	*,
+	timeout: Optional[float] = None,
+	phrase_time_limit: Optional[float] = None,
+	stop_event=None,
+):
+	"""Read one phrase from an open int16 InputStream using a simple energy VAD.
+
+	Returns (float32 audio, monotonic time of speech onset) or None on timeout/stop.
+	Audio goes into one preallocated buffer and is converted to float32 in a single pass.
+	"""
+	import numpy as np
+	threshold = STT_VAD_THRESHOLD if STT_VAD_THRESHOLD is not None else float(STT_ENERGY_THRESHOLD or 300)
+	block_s = _SD_BLOCK / _SD_RATE
+	limit = int((phrase_time_limit or 30.0) * _SD_RATE)
+	buf = np.empty(limit + _SD_PREROLL_BLOCKS * _SD_BLOCK, dtype=np.int16)
+	preroll: List["np.ndarray"] = []
+	waited = 0.0
+	n = 0
+	end = 0
+	started_at = 0.0
+	# Wait for speech onset
+	while True:
+		if stop_event is not None and stop_event.is_set():
+			return None
+		block, _ = stream.read(_SD_BLOCK)
+		block = block[:, 0]
+		if np.abs(block, dtype=np.float32).mean() > threshold:
+			for prev in preroll:
+				buf[n:n + len(prev)] = prev
+				n += len(prev)
+			end = n + limit
+			# Speech onset is this block, not the start of the pre-roll kept before it
+			started_at = time.monotonic() - block_s
+			buf[n:n + len(block)] = block
+			n += len(block)
+			break
+		preroll.append(block.copy())
+		if len(preroll) > _SD_PREROLL_BLOCKS:
+			preroll.pop(0)
+		waited += block_s
+		if timeout is not None and waited >= timeout:
+			return None
+	# Record until enough trailing quiet or the phrase limit
+	quiet_blocks = max(1, round(STT_VAD_SILENCE / block_s))
+	quiet = 0
+	while n < end:
+		if stop_event is not None and stop_event.is_set():
+			break
+		block, _ = stream.read(_SD_BLOCK)
+		block = block[:min(len(block), end - n), 0]
+		buf[n:n + len(block)] = block
+		n += len(block)
+		if np.abs(block, dtype=np.float32).mean() > threshold:
+			quiet = 0
+		else:
+			quiet += 1
+			if quiet >= quiet_blocks:
+				break
+	out = np.empty(n, dtype=np.float32)
+	np.multiply(buf[:n], np.float32(_INT16_TO_F32), out=out, casting='unsafe')
+	return out, started_at
+
+
+def reset_ambient_calibration() -> None:
+	"""Forget the cached ambient energy so the next recognize_once() recalibrates."""
+	global _AMBIENT_ENERGY
+	_AMBIENT_ENERGY = None
+
+
+def recognize_once(
+	*,
+	timeout: Optional[float] = None,
+	phrase_time_limit: Optional[float] = None,
+	language: Optional[str] = None,
+) -> Optional[str]:
+	"""Listen from the microphone once and return recognized text or None.
+
+	- timeout: maximum seconds to wait for phrase start (None = wait indefinitely)
+	- phrase_time_limit: limit max seconds of recorded phrase
+	- language: BCP-47 code like 'en-US'; defaults to STT_LANGUAGE
+	"""
+	global _AMBIENT_ENERGY
+	_init_env()
+	if not is_stt_available():
+		return None
+	if _use_sounddevice():
+		try:
+			with _open_sd_stream(STT_MIC_INDEX) as stream:
+				captured = _sd_capture_phrase(stream, timeout=timeout, phrase_time_limit=phrase_time_limit)
+			if captured is None:
+				return None
+			return _whisper_transcribe_array(captured[0], _SD_RATE, language=(language or STT_LANGUAGE))
+		except Exception:
+			return None
+	try:
+		sr = _get_sr()
+	except Exception:
+		return None
+	try:
+		r = _get_recognizer()
+
+		# Open microphone
+		with sr.Microphone(device_index=STT_MIC_INDEX, sample_rate=16000) as source:
+			# Ambient noise calibration blocks for STT_ADJUST_DURATION, so run it once and
+			# reuse the threshold; dynamic_energy_threshold keeps adapting it while listening
+			if _AMBIENT_ENERGY is not None:
+				r.energy_threshold = _AMBIENT_ENERGY
+			elif STT_DYNAMIC_ENERGY and STT_ADJUST_DURATION > 0:
+				try:
+					r.adjust_for_ambient_noise(source, duration=STT_ADJUST_DURATION)
+					_AMBIENT_ENERGY = r.energy_threshold
+				except Exception:
+					pass
+
+			try:
+				audio = r.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+			finally:
+				if _AMBIENT_ENERGY is not None:
+					_AMBIENT_ENERGY = r.energy_threshold
+
+		# Recognize
+		if STT_ENGINE in WHISPER_ENGINES:
+			arr_sr = _sr_audio_to_float32(audio)
+			if arr_sr is None:
+				return None
+			arr, sr_val = arr_sr
+			text = _whisper_transcribe_array(arr, sr_val, language=(language or STT_LANGUAGE))
+		else:
+			text = _recognize_with_available_engines(r, audio, language=(language or STT_LANGUAGE))
+		return text
+	except sr.WaitTimeoutError:
+		return None
+	except Exception:
+		return None
+
+
+__all__ = [
+	"is_stt_available",
+	"list_microphones",
+	"set_stt_config",
+	"set_capture_enabled",
+	"preload_stt_models",
+	"recognize_once",
+	"reset_ambient_calibration",
+	"start_background_queue",
+	# Globals
+	"STT_ENABLED",
+	"STT_ENGINE",
+	"STT_MIC_INDEX",
+	"STT_LANGUAGE",
+	"STT_ENERGY_THRESHOLD",
+	"STT_DYNAMIC_ENERGY",
+	"STT_ADJUST_DURATION",
+	"STT_WHISPER_MODEL",
+	"STT_WHISPER_DEVICE",
+	"STT_COMPUTE_TYPE",
+	"STT_BEAM_SIZE",
+	"STT_VAD_FILTER",
+	"STT_VAD_MIN_SILENCE_MS",
+	"STT_WITHOUT_TIMESTAMPS",
+	"STT_CONDITION_ON_PREVIOUS_TEXT",
+	"STT_BACKEND",
+	"STT_VAD_THRESHOLD",
+	"STT_VAD_SILENCE",
+	"WHISPER_ENGINES",
+]
+
+
+class _TextQueue:
+	"""Single-producer/single-consumer text queue for recognizer results.
+
+	deque.append/popleft are atomic in CPython, so only the wakeup needs an Event.
+	Mirrors the subset of queue.Queue used by callers: put, get, get_nowait, empty.
+	"""
+
+	def __init__(self) -> None:
+		self._items: deque = deque()
+		self._ready = threading.Event()
+
+	def put(self, item: str) -> None:
+		self._items.append(item)
+		self._ready.set()
+
+	def get_nowait(self) -> str:
+		try:
+			return self._items.popleft()
+		except IndexError:
+			raise Empty from None
+
+	def get(self, block: bool = True, timeout: Optional[float] = None) -> str:
+		if not block:
+			return self.get_nowait()
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while True:
+			try:
+				return self._items.popleft()
+			except IndexError:
+				pass
+			self._ready.clear()
+			# Re-check after clearing so an append racing with clear() is not missed
+			if self._items:
+				continue
+			remaining = None if deadline is None else deadline - time.monotonic()
+			if remaining is not None and remaining <= 0:
+				raise Empty
+			if not self._ready.wait(remaining) and not self._items:
+				raise Empty
+
+	def empty(self) -> bool:
+		return not self._items
+
+
+def start_background_queue(
+	*,
+	mic_index: Optional[int] = None,
+	language: Optional[str] = None,
+	phrase_time_limit: Optional[float] = 10.0,
+):
+	"""Start an always-listening background recognizer.
+
+	Returns a tuple of (queue, stop_function).
+	The queue will receive recognized strings.
+	The stop_function can be called with wait_for_stop: bool = False.
+	"""
+	_init_env()
+	if not is_stt_available():
+		raise RuntimeError("STT not available")
+	if _use_sounddevice():
+		return _start_sd_background_queue(mic_index=mic_index, language=language, phrase_time_limit=phrase_time_limit)
+	sr = _get_sr()
+
+	# The listener thread adapts its own thresholds, so it gets a dedicated Recognizer
+	r = sr.Recognizer()
+	_configure_recognizer(r)
+
+	q = _TextQueue()
+
+	def callback(recognizer, audio):
+		try:
+			if not CAPTURE_ENABLED or _started_before_capture(recognizer, audio):
+				return
+			if STT_ENGINE in WHISPER_ENGINES:
+				arr_sr = _sr_audio_to_float32(audio)
+				if arr_sr is None:
+					return
+				arr, sr_val = arr_sr
+				text = _whisper_transcribe_array(arr, sr_val, language=(language or STT_LANGUAGE))
+			else:
+				text = _recognize_with_available_engines(recognizer, audio, language=(language or STT_LANGUAGE))
+			if isinstance(text, str) and text.strip():
+				q.put(text)
+		except Exception:
+			pass
+
+	# Prepare mic and start
+	mic_idx = STT_MIC_INDEX if mic_index is None else mic_index
+	mic = sr.Microphone(device_index=mic_idx, sample_rate=16000)
+	# Calibrate on an opened source, but start background listener on the mic object
+	try:
+		with mic as source:
+			try:
+				if STT_DYNAMIC_ENERGY and STT_ADJUST_DURATION > 0:
+					r.adjust_for_ambient_noise(source, duration=STT_ADJUST_DURATION)
+			except Exception:
+				pass
+	except Exception:
+		pass
+	# Start background listener (it will manage opening/closing the mic stream)
+	stop_listening = r.listen_in_background(mic, callback, phrase_time_limit=phrase_time_limit)
+
+	def stop_fn(wait_for_stop: bool = False):
+		try:
+			stop_listening(wait_for_stop)
+		except TypeError:
+			# Older SR versions without parameter
+			stop_listening()
+
+	return q, stop_fn
+
+def _start_sd_background_queue(
+	*,
+	mic_index: Optional[int],
+	language: Optional[str],
+	phrase_time_limit: Optional[float],
+):
+	"""sounddevice counterpart of start_background_queue: same (queue, stop_fn) shape."""
+	q = _TextQueue()
+	stop = threading.Event()
+	mic_idx = STT_MIC_INDEX if mic_index is None else mic_index
+
+	def worker():
+		try:
+			with _open_sd_stream(mic_idx) as stream:
+				while not stop.is_set():
+					captured = _sd_capture_phrase(stream, phrase_time_limit=phrase_time_limit, stop_event=stop)
+					if captured is None:
+						continue
+					audio, started_at = captured
+					if not CAPTURE_ENABLED or started_at < _CAPTURE_ENABLED_AT:
+						continue
+					try:
+						text = _whisper_transcribe_array(audio, _SD_RATE, language=(language or STT_LANGUAGE))
+					except Exception:
+						text = None
+					if isinstance(text, str) and text.strip():
+						q.put(text)
+		except Exception:
+			pass
+
+	thread = threading.Thread(target=worker, name="stt-sounddevice", daemon=True)
+	thread.start()
+
+	def stop_fn(wait_for_stop: bool = False):
+		stop.set()
+		if wait_for_stop:
+			thread.join()
+
+	return q, stop_fn
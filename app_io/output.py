@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import atexit
+import sys
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+TTS_ENABLED: bool = True
+TTS_DRIVER: Optional[str] = 'sapi5' if sys.platform.startswith('win') else None
+TTS_RATE: int = 200
+TTS_VOLUME: float = 1.0
+TTS_VOICE_ID: Optional[str] = None
+TTS_VOICE_NAME: Optional[str] = None
+# Optional streaming backend: path to a Piper .onnx voice. When set and `piper-tts` +
+# `sounddevice` are installed, speak_stream_chunk plays PCM as it is
+# synthesized; otherwise it falls back to pyttsx3.
+TTS_PIPER_MODEL: Optional[str] = None
+
+# Cached pyttsx3 engine; the run loop is not reentrant, so all use goes through _TTS_LOCK
+_TTS_ENGINE = None  # type: ignore
+_TTS_ENGINE_DRIVER: Optional[str] = None  # driver the cached engine was created with
+_TTS_ENGINE_THREAD: Optional[int] = None  # ident of the thread that created (and owns) the engine
+_TTS_APPLIED: Dict[str, Any] = {}  # last rate/volume/voice set on the cached engine
+_TTS_LOCK = threading.RLock()
+
+# Cached Piper voice and audio output stream (guarded by _TTS_LOCK as well)
+_PIPER_VOICE = None  # type: ignore
+_PIPER_STREAM = None  # type: ignore
+
+# Set by stop_speaking(); the thread that is playing polls it (Piper between PCM blocks,
+# pyttsx3 at word boundaries) so no engine is ever touched from another thread
+_SPEECH_ABORT = threading.Event()
+
+
+def is_piper_available() -> bool:
+	if not TTS_PIPER_MODEL:
+		return False
+	try:
+		import piper  # noqa: F401
+		import sounddevice  # noqa: F401
+		return True
+	except Exception:
+		return False
+
+
+def is_tts_available() -> bool:
+	if not TTS_ENABLED:
+		return False
+	if is_piper_available():
+		return True
+	try:
+		import pyttsx3
+		return True
+	except Exception:
+		return False
+
+
+def _get_tts_engine():
+	"""Return the shared pyttsx3 engine, (re)initializing it on first use or a driver change."""
+	global _TTS_ENGINE, _TTS_ENGINE_DRIVER, _TTS_ENGINE_THREAD
+	with _TTS_LOCK:
+		if _TTS_ENGINE is None or _TTS_ENGINE_DRIVER != TTS_DRIVER:
+			import pyttsx3
+			_TTS_ENGINE = pyttsx3.init(driverName=TTS_DRIVER) if TTS_DRIVER else pyttsx3.init()
+			_TTS_ENGINE.connect('started-word', _on_started_word)
+			_TTS_ENGINE_DRIVER = TTS_DRIVER
+			_TTS_ENGINE_THREAD = threading.get_ident()
+			_TTS_APPLIED.clear()
+		return _TTS_ENGINE
+
+
+def _on_started_word(name, location, length) -> None:
+	# Runs inside runAndWait on the thread that is speaking, where stop() is safe
+	if _SPEECH_ABORT.is_set() and _TTS_ENGINE is not None:
+		_TTS_ENGINE.stop()
+
+
+def _set_engine_property(engine, name: str, value: Any) -> None:
+	"""setProperty, skipped when the engine already has this value from a previous call."""
+	if name in _TTS_APPLIED and _TTS_APPLIED[name] == value:
+		return
+	try:
+		engine.setProperty(name, value)
+		_TTS_APPLIED[name] = value
+	except Exception:
+		pass
+
+
+def _shutdown_tts_engine() -> None:
+	engine = _TTS_ENGINE
+	if engine is None:
+		return
+	if _TTS_ENGINE_THREAD != threading.get_ident():
+		# Owned by another thread (e.g. a TTS worker); a SAPI5 COM engine must not be
+		# driven from here, so just ask any utterance still playing to stop
+		_SPEECH_ABORT.set()
+		return
+	try:
+		engine.stop()
+	except Exception:
+		pass
+
+
+atexit.register(_shutdown_tts_engine)
+
+
+def _get_piper_voice():
+	"""Return the shared Piper voice and output stream, loading them on first use."""
+	global _PIPER_VOICE, _PIPER_STREAM
+	with _TTS_LOCK:
+		if _PIPER_VOICE is None:
+			from piper.voice import PiperVoice
+			_PIPER_VOICE = PiperVoice.load(TTS_PIPER_MODEL)
+		if _PIPER_STREAM is None:
+			import sounddevice as sd
+			_PIPER_STREAM = sd.RawOutputStream(samplerate=_PIPER_VOICE.config.sample_rate, channels=1, dtype='int16')
+			_PIPER_STREAM.start()
+		return _PIPER_VOICE
+
+
+def _piper_pcm(voice, text: str) -> Iterator[bytes]:
+	"""Yield int16 mono PCM for `text` as Piper produces it."""
+	synthesize_raw = getattr(voice, 'synthesize_stream_raw', None)
+	if synthesize_raw is not None:
+		# piper-tts < 1.3
+		yield from synthesize_raw(text)
+		return
+	# piper-tts >= 1.3 yields AudioChunk objects per sentence
+	for chunk in voice.synthesize(text):
+		yield chunk.audio_int16_bytes
+
+
+def _speak_piper(text: str) -> bool:
+	with _TTS_LOCK:
+		voice = _get_piper_voice()
+		_SPEECH_ABORT.clear()
+		for pcm in _piper_pcm(voice, text):
+			if _SPEECH_ABORT.is_set():
+				break
+			_PIPER_STREAM.write(pcm)
+	return True
+
+
+def preload_tts_engine() -> bool:
+	"""Initialize the shared engine ahead of the first utterance to avoid cold-start latency."""
+	if not TTS_ENABLED:
+		return False
+	try:
+		if is_piper_available():
+			_get_piper_voice()
+		else:
+			_get_tts_engine()
+		return True
+	except Exception:
+		return False
+
+
+def list_voices() -> List[Dict[str, Any]]:
+	"""List the shared engine's voices; call it from the thread that drives that engine."""
+	try:
+		with _TTS_LOCK:
+			engine = _get_tts_engine()
+			voices = []
+			for v in engine.getProperty('voices') or []:
+				voices.append({
+					'id': getattr(v, 'id', None),
+					'name': getattr(v, 'name', None),
+					'languages': getattr(v, 'languages', None),
+					'gender': getattr(v, 'gender', None),
+					'age': getattr(v, 'age', None),
+				})
+		return voices
+	except Exception:
+		return []
+
+
+def set_tts_config(
+	*,
+	enabled: Optional[bool] = None,
+	driver: Optional[str] = None,
+	rate: Optional[int] = None,
+	volume: Optional[float] = None,
+	voice_id: Optional[str] = None,
+	voice_name: Optional[str] = None,
+	piper_model: Optional[str] = None,
+) -> None:
+	global TTS_ENABLED, TTS_DRIVER, TTS_RATE, TTS_VOLUME, TTS_VOICE_ID, TTS_VOICE_NAME, TTS_PIPER_MODEL, _PIPER_VOICE, _PIPER_STREAM
+	if enabled is not None:
+		TTS_ENABLED = bool(enabled)
+	if driver is not None:
+		TTS_DRIVER = driver
+	if rate is not None:
+		TTS_RATE = int(rate)
+	if volume is not None:
+		TTS_VOLUME = float(volume)
+	if voice_id is not None:
+		TTS_VOICE_ID = voice_id
+	if voice_name is not None:
+		TTS_VOICE_NAME = voice_name
+	if piper_model is not None and piper_model != TTS_PIPER_MODEL:
+		with _TTS_LOCK:
+			TTS_PIPER_MODEL = piper_model
+			_PIPER_VOICE = None
+			# A new voice may use a different sample rate, so reopen the stream too
+			if _PIPER_STREAM is not None:
+				try:
+					_PIPER_STREAM.close()
+				except Exception:
+					pass
+				_PIPER_STREAM = None
+
+
+def _select_voice(engine, *, voice_id: Optional[str], voice_name: Optional[str]) -> None:
+	# Enumerating voices is slow on SAPI5; skip it when the same selection is already applied
+	request = (voice_id, voice_name)
+	if _TTS_APPLIED.get('voice_request') == request:
+		return
+	try:
+		voices = engine.getProperty('voices') or []
+		if voice_id:
+			for v in voices:
+				if getattr(v, 'id', None) == voice_id:
+					_set_engine_property(engine, 'voice', v.id)
+					_TTS_APPLIED['voice_request'] = request
+					return
+		if voice_name:
+			target = voice_name.lower()
+			for v in voices:
+				name = (getattr(v, 'name', '') or '').lower()
+				vid = (getattr(v, 'id', '') or '').lower()
+				if target in name or target in vid:
+					_set_engine_property(engine, 'voice', v.id)
+					_TTS_APPLIED['voice_request'] = request
+					return
+		_TTS_APPLIED['voice_request'] = request
+	except Exception:
+		pass
+
+
+def speak(
+	text: str,
+	*,
+	rate: Optional[int] = None,
+	volume: Optional[float] = None,
+	voice_id: Optional[str] = None,
+	voice_name: Optional[str] = None,
+) -> bool:
+	if not TTS_ENABLED:
+		return False
+	if not isinstance(text, str) or not text.strip():
+		return False
+	try:
+		with _TTS_LOCK:
+			engine = _get_tts_engine()
+			_set_engine_property(engine, 'volume', float(TTS_VOLUME if volume is None else volume))
+			_set_engine_property(engine, 'rate', int(TTS_RATE if rate is None else rate))
+			_select_voice(
+				engine,
+				voice_id=voice_id if voice_id is not None else TTS_VOICE_ID,
+				voice_name=voice_name if voice_name is not None else TTS_VOICE_NAME,
+			)
+			_SPEECH_ABORT.clear()
+			engine.say(text)
+			engine.runAndWait()
+		return True
+	except Exception:
+		return False
+
+
+def speak_stream_chunk(text: str) -> bool:
+	"""Speak one sentence, streaming audio through Piper when configured.
+
+	Audio starts as soon as Piper has synthesized the first frames; falls back to
+	pyttsx3 `speak` when Piper is unavailable or fails.
+	"""
+	if not TTS_ENABLED:
+		return False
+	if not isinstance(text, str) or not text.strip():
+		return False
+	if is_piper_available():
+		try:
+			return _speak_piper(text)
+		except Exception:
+			pass
+	return speak(text)
+
+
+def stop_speaking() -> None:
+	"""Ask the utterance currently playing to stop; safe to call from any thread.
+
+	Piper stops before its next PCM block and pyttsx3 at its next word boundary.
+	The engine itself is only stopped from the thread that is speaking: a SAPI5
+	engine is a COM object and cannot be driven from another thread.
+	"""
+	_SPEECH_ABORT.set()
+
+
+__all__ = [
+	"speak",
+	"speak_stream_chunk",
+	"stop_speaking",
+	"is_piper_available",
+	"is_tts_available",
+	"list_voices",
+	"preload_tts_engine",
+	"set_tts_config",
+	"TTS_ENABLED",
+	"TTS_DRIVER",
+	"TTS_RATE",
+	"TTS_VOLUME",
+	"TTS_VOICE_ID",
+	"TTS_VOICE_NAME",
+	"TTS_PIPER_MODEL",
+]
\ No newline at end of file
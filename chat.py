@@ -1,44 +1,202 @@
+import re
 import sys
+import threading
 import time
-from typing import Iterable, Generator
-from queue import Empty
+from typing import Any, Callable, Iterable, Generator, Optional, Union
+from queue import Empty, Queue
 
 from engine import ChatSession, SYSTEM_PROMPT, MODEL
-from logger import logger, styles
-
-import importlib.util
-from pathlib import Path
-
-_output_mod = None
-try:
-    _output_path = Path(__file__).resolve().parent / "io" / "output.py"
-    _spec = importlib.util.spec_from_file_location("app_output", str(_output_path))
-    if _spec and _spec.loader:
-        _output_mod = importlib.util.module_from_spec(_spec)
-        _spec.loader.exec_module(_output_mod)
-except Exception:
-    _output_mod = None
-
-_input_mod = None
-try:
-    _input_path = Path(__file__).resolve().parent / "io" / "input.py"
-    _ispec = importlib.util.spec_from_file_location("app_input", str(_input_path))
-    if _ispec and _ispec.loader:
-        _input_mod = importlib.util.module_from_spec(_ispec)
-        _ispec.loader.exec_module(_input_mod)
-except Exception:
-    _input_mod = None
+from logger import logger
+
+from app_io import input as _input_mod
+from app_io import output as _output_mod
+
+# Resolved once; called on every turn to gate microphone capture
+_set_capture = _input_mod.set_capture_enabled
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z']+")
+_MIC_RE = re.compile(r"(?:microphone|mic)\s*(\d+)")
+
+_EXIT_WORDS = frozenset({"goodbye", "exit", "quit"})
+_MENU_QUIT_WORDS = frozenset({"quit", "exit", "stop"})
+_MENU_NEXT_WORDS = frozenset({"next", "forward"})
+_MENU_PREVIOUS_WORDS = frozenset({"previous", "back", "prior"})
+_MENU_TEST_WORDS = frozenset({"test", "testing"})
+_MENU_SELECT_WORDS = frozenset({"select", "choose"})
+
+# Terminal prompt for the user's line, shared with logger.user_log so the colour setting applies
+USER_PROMPT = logger.USER_PROMPT
+_LINE_END = logger.LINE_END
+
+TTS_MAX_BUFFER_DELAY = 0.6  # seconds a partial sentence may wait before it is spoken anyway
+
+# Items are text to speak, a callable to run on the TTS thread, or None to stop the worker
+_tts_queue: "Queue[Union[str, Callable[[], None], None]]" = Queue()
+_tts_thread: Optional[threading.Thread] = None
+
+# Microphone capture stays off while speech is queued/playing or the main loop holds it
+_capture_lock = threading.Lock()
+_tts_pending = 0
+_capture_held = False
+
+
+def _refresh_capture_locked() -> None:
+    try:
+        _set_capture(_tts_pending == 0 and not _capture_held)
+    except Exception:
+        pass
+
+
+def _hold_capture(held: bool) -> None:
+    global _capture_held
+    with _capture_lock:
+        _capture_held = held
+        _refresh_capture_locked()
+
+
+def _tts_loop() -> None:
+    global _tts_pending
+    # Create the pyttsx3 engine on this thread, which then owns it for every utterance
+    try:
+        _output_mod.preload_tts_engine()
+    except Exception:
+        pass
+    while True:
+        text = _tts_queue.get()
+        try:
+            if text is None:
+                return
+            if callable(text):
+                text()
+            else:
+                _output_mod.speak_stream_chunk(text)
+        except Exception:
+            pass
+        finally:
+            if isinstance(text, str):
+                # Re-arm the mic as soon as the last queued utterance has finished playing
+                with _capture_lock:
+                    _tts_pending -= 1
+                    _refresh_capture_locked()
+            _tts_queue.task_done()
+
+
+def _start_tts_worker() -> None:
+    global _tts_thread
+    if _tts_thread is None or not _tts_thread.is_alive():
+        _tts_thread = threading.Thread(target=_tts_loop, name="tts", daemon=True)
+        _tts_thread.start()
+
+
+def _enqueue_speech(text: str) -> None:
+    global _tts_pending
+    text = text.strip()
+    if text:
+        with _capture_lock:
+            _tts_pending += 1
+            _refresh_capture_locked()
+        _tts_queue.put(text)
+
+
+def _drain_tts_queue() -> None:
+    global _tts_pending
+    while True:
+        try:
+            item = _tts_queue.get_nowait()
+        except Empty:
+            return
+        if isinstance(item, str):
+            with _capture_lock:
+                _tts_pending -= 1
+                _refresh_capture_locked()
+        _tts_queue.task_done()
+
+
+def _speak_as_generated(stream: Iterable[str]) -> Generator[str, None, None]:
+    # Hand text to the TTS worker while the model is still generating: flush on
+    # sentence ends, or on the last word break once the oldest unspoken text has
+    # waited too long. The wait is measured from when that text arrived, so a slow
+    # first token or a stall between tokens does not force a fragment out.
+    buf = ""
+    waiting_since = 0.0
+    for chunk in stream:
+        yield chunk
+        if not buf:
+            waiting_since = time.monotonic()
+        buf += chunk
+        *sentences, buf = _SENTENCE_SPLIT.split(buf)
+        for sentence in sentences:
+            _enqueue_speech(sentence)
+        if sentences:
+            waiting_since = time.monotonic()
+        elif time.monotonic() - waiting_since > TTS_MAX_BUFFER_DELAY:
+            cut = buf.rfind(" ")
+            if cut > 0:
+                _enqueue_speech(buf[:cut])
+                buf = buf[cut + 1:]
+                waiting_since = time.monotonic()
+    _enqueue_speech(buf)
+
+
+def _call_on_tts_thread(fn: Callable[[], Any]) -> Any:
+    """Run `fn` on the TTS worker and return its result.
+
+    The worker created the pyttsx3 engine, and SAPI5 engines are COM objects that
+    must only be used from that thread.
+    """
+    if _tts_thread is None or not _tts_thread.is_alive():
+        return fn()
+    done = threading.Event()
+    result: dict = {}
+
+    def job() -> None:
+        try:
+            result["value"] = fn()
+        except Exception as exc:
+            result["error"] = exc
+        finally:
+            done.set()
+
+    _tts_queue.put(job)
+    done.wait()
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
+
+
+def _say(text: str) -> None:
+    if _tts_thread is not None and _tts_thread.is_alive():
+        _enqueue_speech(text)
+        _tts_queue.join()
+    else:
+        _output_mod.speak(text)
+
+
+def _start_ticker(interval: float = 0.8) -> threading.Event:
+    """Print a "still listening" dot every `interval` seconds until the returned event is set."""
+    stop = threading.Event()
+
+    def _tick() -> None:
+        while not stop.wait(interval):
+            try:
+                sys.stdout.write(".")
+                sys.stdout.flush()
+            except Exception:
+                pass
+
+    threading.Thread(target=_tick, name="listen-ticker", daemon=True).start()
+    return stop
+
 
 def _voice_menu() -> None:
-    if not _output_mod or not _input_mod:
-        return
     try:
-        voices = _output_mod.list_voices()
+        voices = _call_on_tts_thread(_output_mod.list_voices)
     except Exception:
         voices = []
     if not voices:
         try:
-            _output_mod.speak("No voices found.")
+            _say("No voices found.")
         except Exception:
             pass
         return
@@ -49,34 +207,34 @@ def _voice_menu() -> None:
         vid = str(v.get('id'))
         vname = str(v.get('name'))
         try:
-            _output_mod.speak(f"Voice {idx+1} of {total}: {vname}. Say next, previous, test, select, or quit.")
+            _say(f"Voice {idx+1} of {total}: {vname}. Say next, previous, test, select, or quit.")
         except Exception:
             pass
         try:
             choice = _input_mod.recognize_once(timeout=5.0, phrase_time_limit=4.0)
         except Exception:
             choice = None
-        cmd = (choice or "").strip().lower()
-        if not cmd:
+        words = set(_WORD_RE.findall((choice or "").lower()))
+        if not words:
             continue
-        if any(k in cmd for k in ("quit", "exit", "stop")):
+        if words & _MENU_QUIT_WORDS:
             return
-        if any(k in cmd for k in ("next", "forward")):
+        if words & _MENU_NEXT_WORDS:
             idx = (idx + 1) % total
             continue
-        if any(k in cmd for k in ("previous", "back", "prior")):
+        if words & _MENU_PREVIOUS_WORDS:
             idx = (idx - 1) % total
             continue
-        if "test" in cmd:
+        if words & _MENU_TEST_WORDS:
             try:
-                _output_mod.speak(f"Testing {vname}")
+                _say(f"Testing {vname}")
             except Exception:
                 pass
             continue
-        if "select" in cmd or "choose" in cmd:
+        if words & _MENU_SELECT_WORDS:
             try:
                 _output_mod.set_tts_config(voice_id=vid, voice_name=None)
-                _output_mod.speak(f"Selected {vname}")
+                _say(f"Selected {vname}")
             except Exception:
                 pass
             return
@@ -86,26 +244,24 @@ def main() -> int:
     logger.system_log("Starting continuous chat. Say 'Goodbye' to stop.")
     logger.set_model(MODEL)
 
-    tts_available = bool(_output_mod and getattr(_output_mod, "is_tts_available", lambda: False)())
+    tts_available = _output_mod.is_tts_available()
     if tts_available:
-        logger.system_log("TTS enabled - responses will be spoken after generation.")
+        logger.system_log("TTS enabled - responses will be spoken sentence by sentence as they are generated.")
     else:
-        logger.system_log("TTS not available - pyttsx3 not installed.")
+        logger.system_log("TTS not available - neither Piper nor pyttsx3 is installed.")
 
-    stt_available = bool(_input_mod and getattr(_input_mod, "is_stt_available", lambda: False)())
+    stt_available = _input_mod.is_stt_available()
     if stt_available:
         try:
-            if _input_mod and hasattr(_input_mod, "set_stt_config"):
-                _input_mod.set_stt_config(engine="whisper", whisper_model="base.en", whisper_device="cpu")
-                if hasattr(_input_mod, "preload_stt_models"):
-                    _input_mod.preload_stt_models()
+            _input_mod.set_stt_config(engine="faster-whisper", whisper_model="base.en")
+            _input_mod.preload_stt_models()
         except Exception:
             pass
 
         try:
-            engine_name = getattr(_input_mod, "STT_ENGINE", "?")
-            whisper_model = getattr(_input_mod, "STT_WHISPER_MODEL", None)
-            if engine_name in {"whisper", "faster-whisper"} and whisper_model:
+            engine_name = _input_mod.STT_ENGINE
+            whisper_model = _input_mod.STT_WHISPER_MODEL
+            if engine_name in _input_mod.WHISPER_ENGINES and whisper_model:
                 logger.system_log(f"STT enabled ({engine_name}, model={whisper_model}) - always listening. Speak your requests and commands.")
             else:
                 logger.system_log(f"STT enabled ({engine_name}) - always listening. Speak your requests and commands.")
@@ -116,6 +272,9 @@ def main() -> int:
         logger.system_log("Voice-only mode requires STT. Exiting.")
         return 1
 
+    if tts_available:
+        _start_tts_worker()
+
     session = ChatSession(
         system_prompt=SYSTEM_PROMPT,
         model=MODEL,
@@ -127,97 +286,86 @@ def main() -> int:
     stt_stop = None
     if stt_available:
         try:
-            start_q = getattr(_input_mod, 'start_background_queue', None)
-            if start_q:
-                stt_queue, stt_stop = start_q()
+            stt_queue, stt_stop = _input_mod.start_background_queue()
         except Exception:
             stt_queue, stt_stop = None, None
 
     def get_next_user_text() -> str:
         nonlocal stt_queue, stt_stop
-        last_tick = 0.0
-        try:
-            if _input_mod:
-                getattr(_input_mod, 'set_capture_enabled', lambda x: None)(True)
-        except Exception:
-            pass
-        try:
-            if stt_queue is not None:
-                while True:
+        if stt_queue is not None:
+            while True:
+                try:
                     stt_queue.get_nowait()
-        except Empty:
-            pass
-        except Exception:
-            pass
+                except Empty:
+                    break
+                except Exception:
+                    break
         SILENCE_GAP = 1.5
         while True:
             if stt_mode and stt_queue is not None:
+                ticker = _start_ticker()
                 try:
-                    text = stt_queue.get(timeout=0.25)
-                    if isinstance(text, str) and text.strip():
-                        parts: list[str] = [text.strip()]
-                        last_add = time.time()
-                        while True:
-                            try:
-                                more = stt_queue.get(timeout=0.35)
-                                if isinstance(more, str) and more.strip():
-                                    parts.append(more.strip())
-                                    last_add = time.time()
-                                    try:
-                                        sys.stdout.write("\r" + f"{styles.RESET}{styles.BLUE}[{styles.WHITE}user{styles.BLUE}] > {styles.ITALICS}" + " ".join(parts) + styles.RESET + "\x1b[K")
-                                        sys.stdout.flush()
-                                    except Exception:
-                                        pass
-                                    continue
-                            except Empty:
-                                pass
-                            if time.time() - last_add >= SILENCE_GAP:
-                                break
-                        return " ".join(parts)
-                except Empty:
-                    now = time.time()
-                    if now - last_tick >= 0.8:
+                    text = ""
+                    while not text:
                         try:
-                            sys.stdout.write(".")
-                            sys.stdout.flush()
-                        except Exception:
-                            pass
-                        last_tick = now
-                    continue
+                            got = stt_queue.get(timeout=1.0)
+                        except Empty:
+                            continue
+                        if isinstance(got, str):
+                            text = got.strip()
+                finally:
+                    ticker.set()
+                # Keep collecting until nothing new has been heard for SILENCE_GAP seconds
+                parts: list[str] = [text]
+                while True:
+                    try:
+                        more = stt_queue.get(timeout=SILENCE_GAP)
+                    except Empty:
+                        break
+                    more = more.strip() if isinstance(more, str) else ""
+                    if not more:
+                        continue
+                    parts.append(more)
+                    # One write + flush per redraw
+                    try:
+                        sys.stdout.write("\r" + USER_PROMPT + " ".join(parts) + _LINE_END)
+                        sys.stdout.flush()
+                    except Exception:
+                        pass
+                return " ".join(parts)
             else:
                 try:
-                    start_q = getattr(_input_mod, 'start_background_queue', None)
-                    if start_q:
-                        stt_queue, stt_stop = start_q()
-                        continue
+                    stt_queue, stt_stop = _input_mod.start_background_queue()
+                    continue
                 except Exception:
                     pass
                 time.sleep(0.25)
 
+    interrupted = False
     print()
     while True:
         try:
-            prompt_prefix = f"{styles.RESET}{styles.BLUE}[{styles.WHITE}user{styles.BLUE}] > {styles.ITALICS}"
             try:
-                sys.stdout.write(prompt_prefix)
+                sys.stdout.write(USER_PROMPT)
                 sys.stdout.flush()
             except Exception:
                 pass
 
             user = get_next_user_text()
-        except (EOFError, KeyboardInterrupt):
+        except (EOFError, KeyboardInterrupt) as e:
+            interrupted = isinstance(e, KeyboardInterrupt)
             print()
             break
 
         try:
             typed = user.strip()
-            sys.stdout.write("\r" + prompt_prefix + typed + styles.RESET + "\x1b[K\n")
+            sys.stdout.write("\r" + USER_PROMPT + typed + _LINE_END + "\n")
             sys.stdout.flush()
         except Exception:
             pass
 
         cmd = user.strip().lower()
-        if cmd in {"/bye"} or "goodbye" in cmd or "exit" in cmd or "quit" in cmd:
+        if cmd == "/bye" or set(_WORD_RE.findall(cmd)) & _EXIT_WORDS:
             break
 
         if cmd.startswith("/voice") or "voice menu" in cmd or cmd == "voice":
@@ -244,11 +392,10 @@ def main() -> int:
                 logger.system_log("STT not available.")
                 continue
             idx = None
-            import re
-            m = re.search(r"(microphone|mic)\s*(\d+)", cmd)
+            m = _MIC_RE.search(cmd)
             if m:
                 try:
-                    idx = int(m.group(2))
+                    idx = int(m.group(1))
                 except Exception:
                     idx = None
             if idx is None and cmd.startswith("/micset"):
@@ -268,38 +415,23 @@ def main() -> int:
                 logger.system_log("Failed to set microphone index.")
             continue
 
-        try:
-            if _input_mod:
-                getattr(_input_mod, 'set_capture_enabled', lambda x: None)(False)
-        except Exception:
-            pass
+        _hold_capture(True)
 
         gen = session.ask_stream(user)
 
-        collected: list[str] = []
-        def capture_and_yield(stream: Iterable[str]) -> Generator[str, None, None]:
-            for chunk in stream:
-                collected.append(chunk)
-                yield chunk
+        # Without TTS the reply is only printed, so stream it straight through
+        logger.llm_log(_speak_as_generated(gen) if tts_available else gen, stream=True)
 
-        logger.llm_log(capture_and_yield(gen), stream=True)
-
-        if tts_available and collected and _output_mod:
-            full_text = "".join(collected)
-            if full_text.strip():
-                try:
-                    _output_mod.speak(full_text)
-                except Exception:
-                    pass
-            time.sleep(1.2)
-
-        try:
-            if _input_mod:
-                getattr(_input_mod, 'set_capture_enabled', lambda x: None)(True)
-        except Exception:
-            pass
+        # Speech keeps playing on the TTS worker, which re-enables capture when it is done
+        _hold_capture(False)
 
     logger.system_log("Chat ended.")
+    if _tts_thread is not None:
+        if interrupted:
+            # Drop queued sentences first, or the worker would speak them after the stop
+            _drain_tts_queue()
+            _output_mod.stop_speaking()
+        _tts_queue.put(None)
     try:
         if stt_stop:
             try:
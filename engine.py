@@ -1,16 +1,35 @@
 # print("Hello, World!")
 
+import io
 import json
 import os
+import threading
+import time
+from queue import Empty, Queue
 from typing import Generator, Iterable, Optional, List, Dict, Union
 import requests
+from requests.adapters import HTTPAdapter
 
 from logger import logger
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 MODEL = "qwen2.5:0.5b"
 # MODEL = "gpt-oss:20b"
 TERMINAL_LOGGING = True
 SYSTEM_PROMPT = "Respond in a single sentence."
+KEEP_ALIVE = "30m"  # how long Ollama keeps the model loaded between turns
+COALESCE_CHARS = 32  # yield pending tokens once this many characters are buffered...
+COALESCE_DELAY = 0.02  # ...or once the oldest pending token is this many seconds old
 
 def load_file_card(file_path):
     with open('file_cards/' + file_path, 'r') as file:
@@ -19,6 +38,98 @@ def load_file_card(file_path):
 
 Message = Dict[str, str]
 
+# Shared HTTP session so every turn reuses a pooled keep-alive connection to Ollama
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_SESSION.headers.update({"Connection": "keep-alive"})
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _iter_ndjson_lines(resp: requests.Response) -> Generator[bytes, None, None]:
+    # Split the raw byte stream on newlines ourselves; Ollama sends chunked
+    # responses, so each read returns as soon as a chunk arrives.
+    buf = bytearray()
+    for block in resp.raw.stream(65536, decode_content=True):
+        buf.extend(block)
+        start = 0
+        while True:
+            end = buf.find(b"\n", start)
+            if end < 0:
+                break
+            if end > start:
+                yield bytes(buf[start:end])
+            start = end + 1
+        if start:
+            del buf[:start]
+    if buf.strip():
+        yield bytes(buf)
+
+
+def _iter_stream_content(resp: requests.Response) -> Generator[str, None, None]:
+    for raw_line in _iter_ndjson_lines(resp):
+        try:
+            # Both parsers accept the raw bytes; orjson.JSONDecodeError subclasses json's
+            chunk = _json_loads(raw_line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(chunk, dict) and chunk.get("error"):
+            raise RuntimeError(f"Ollama error: {chunk['error']}")
+        if chunk.get("done") is True:
+            break
+        content = (chunk.get("message") or {}).get("content")
+        if content:
+            yield content
+
+
+_STREAM_END = object()
+
+
+def _coalesce(stream: Iterable[str]) -> Generator[str, None, None]:
+    """Batch tiny token deltas into fewer, larger chunks without delaying them noticeably.
+
+    A reader thread drains ``stream`` into a queue; deltas are joined until
+    COALESCE_CHARS characters are pending or COALESCE_DELAY has passed.
+    """
+    q: "Queue[object]" = Queue()
+
+    def _pump() -> None:
+        try:
+            for delta in stream:
+                q.put(delta)
+        except Exception as e:
+            q.put(e)
+        q.put(_STREAM_END)
+
+    threading.Thread(target=_pump, name="ollama-stream", daemon=True).start()
+
+    pending: List[str] = []
+    pending_len = 0
+    first_at = 0.0
+    while True:
+        timeout = None
+        if pending:
+            timeout = max(0.0, COALESCE_DELAY - (time.monotonic() - first_at))
+        try:
+            item = q.get(timeout=timeout)
+        except Empty:
+            yield "".join(pending)
+            pending, pending_len = [], 0
+            continue
+        if item is _STREAM_END or isinstance(item, Exception):
+            if pending:
+                yield "".join(pending)
+            if item is _STREAM_END:
+                return
+            raise item
+        if not pending:
+            first_at = time.monotonic()
+        pending.append(item)
+        pending_len += len(item)
+        if pending_len >= COALESCE_CHARS:
+            yield "".join(pending)
+            pending, pending_len = [], 0
+
 
 def call_llm(
     prompt: str,
@@ -36,9 +147,6 @@ def call_llm(
     if method.lower() != "ollama":
         raise NotImplementedError(f"Unsupported method: {method}")
 
-    base = base_url or os.getenv("OLLAMA_HOST", "http://localhost:11434")
-    url = f"{base.rstrip('/')}/api/chat"
-
     messages: List[Message] = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
@@ -57,41 +165,62 @@ def call_llm(
         "model": model,
         "messages": messages,
         "stream": bool(stream),
+        "keep_alive": KEEP_ALIVE,
         "options": {
             "temperature": float(temperature),
             "num_predict": int(max_tokens),
         },
     }
+    return _post_chat(_chat_url(base_url), payload, stream=stream)
+
+
+def _base_url(base_url: Optional[str]) -> str:
+    """Ollama server root: `base_url`, or $OLLAMA_HOST when it is empty, without a trailing slash."""
+    base = base_url or os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    return base.rstrip('/')
+
+
+def _chat_url(base_url: Optional[str]) -> str:
+    return f"{_base_url(base_url)}/api/chat"
 
+
+def _post_chat(url: str, payload: dict, *, stream: bool) -> Union[str, Generator[str, None, None]]:
+    body = _json_dumps(payload)
     if stream:
         def _generator() -> Generator[str, None, None]:
-            with requests.post(url, json=payload, stream=True, timeout=(5, 300)) as resp:
+            with _SESSION.post(url, data=body, headers=_JSON_HEADERS, stream=True, timeout=(5, 300)) as resp:
                 if resp.status_code != 200:
                     raise RuntimeError(f"Ollama HTTP {resp.status_code}: {resp.text}")
-                for raw_line in resp.iter_lines(decode_unicode=True):
-                    if not raw_line:
-                        continue
-                    try:
-                        chunk = json.loads(raw_line)
-                    except json.JSONDecodeError:
-                        continue
-                    if isinstance(chunk, dict) and chunk.get("error"):
-                        raise RuntimeError(f"Ollama error: {chunk['error']}")
-                    if chunk.get("done") is True:
-                        break
-                    content = (chunk.get("message") or {}).get("content")
-                    if content:
-                        yield content
+                yield from _coalesce(_iter_stream_content(resp))
         return _generator()
     else:
-        with requests.post(url, json=payload, timeout=(5, 300)) as resp:
+        with _SESSION.post(url, data=body, headers=_JSON_HEADERS, stream=False, timeout=(5, 300)) as resp:
             if resp.status_code != 200:
                 raise RuntimeError(f"Ollama HTTP {resp.status_code}: {resp.text}")
-            data = resp.json()
+            data = _json_loads(resp.content)
             msg = data.get("message") or {}
             return msg.get("content", "")
 
 
+def warm_up_connection(base_url: Optional[str] = "http://localhost:11434") -> bool:
+    """Open a pooled connection to Ollama ahead of the first chat request."""
+    try:
+        with _SESSION.get(f"{_base_url(base_url)}/api/tags", timeout=2) as resp:
+            return resp.status_code == 200
+    except Exception:
+        return False
+
+
+def warm_up_model(model: str = MODEL, base_url: Optional[str] = "http://localhost:11434") -> bool:
+    """Ask Ollama to load the model now so the first real turn does not pay the load cost."""
+    try:
+        url = f"{_base_url(base_url)}/api/generate"
+        with _SESSION.post(url, json={"model": model, "prompt": "", "keep_alive": KEEP_ALIVE}, timeout=(5, 300)) as resp:
+            return resp.status_code == 200
+    except Exception:
+        return False
+
+
 class ChatSession:
     def __init__(
         self,
@@ -102,53 +231,99 @@ class ChatSession:
         temperature: float = 0,
         max_tokens: int = 512,
         terminal_logging: bool = True,
+        warm_up: bool = True,
+        max_history_messages: int = 20,
     ) -> None:
+        # The setters below also cache the per-request values derived from these
         self.system_prompt = system_prompt
         self.model = model
         self.base_url = base_url
-        self.temperature = temperature
+        self._temperature = temperature
         self.max_tokens = max_tokens
         self.terminal_logging = terminal_logging
+        self.max_history_messages = max_history_messages
         self.history: List[Message] = []
+        if warm_up:
+            # Separate threads: the connection warm-up returns a socket to the pool quickly,
+            # while the model load can keep its own connection busy for seconds
+            threading.Thread(target=warm_up_connection, args=(base_url,), daemon=True).start()
+            threading.Thread(target=warm_up_model, args=(model, base_url), daemon=True).start()
+
+    @property
+    def system_prompt(self) -> str:
+        return self._system_prompt
+
+    @system_prompt.setter
+    def system_prompt(self, value: str) -> None:
+        self._system_prompt = value
+        self._system_messages: List[Message] = [{"role": "system", "content": value}] if value else []
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @base_url.setter
+    def base_url(self, value: str) -> None:
+        self._base_url = value
+        self._url = _chat_url(value)
+
+    @property
+    def temperature(self) -> float:
+        return self._temperature
+
+    @temperature.setter
+    def temperature(self, value: float) -> None:
+        self._temperature = value
+        self._update_options()
+
+    @property
+    def max_tokens(self) -> int:
+        return self._max_tokens
+
+    @max_tokens.setter
+    def max_tokens(self, value: int) -> None:
+        self._max_tokens = value
+        self._update_options()
+
+    def _update_options(self) -> None:
+        # A new dict rather than an in-place update, so an in-flight payload keeps its options
+        self._options = {"temperature": float(self._temperature), "num_predict": int(self._max_tokens)}
+
+    def _payload(self, prompt: str, *, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "messages": [*self._system_messages, *self.history, {"role": "user", "content": prompt}],
+            "stream": stream,
+            "keep_alive": KEEP_ALIVE,
+            "options": self._options,
+        }
 
     def ask_stream(self, prompt: str) -> Generator[str, None, None]:
         def _gen() -> Generator[str, None, None]:
-            chunks: List[str] = []
-            gen = call_llm(
-                prompt,
-                system_prompt=self.system_prompt,
-                method="ollama",
-                model=self.model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                stream=True,
-                base_url=self.base_url,
-                history=self.history,
-            )
+            buf = io.StringIO()
+            gen = _post_chat(self._url, self._payload(prompt, stream=True), stream=True)
             for delta in gen:
-                chunks.append(delta)
+                buf.write(delta)
                 yield delta
-            self.history.append({"role": "user", "content": prompt})
-            self.history.append({"role": "assistant", "content": "".join(chunks)})
+            self._remember(prompt, buf.getvalue())
         return _gen()
 
     def ask(self, prompt: str) -> str:
-        reply = call_llm(
-            prompt,
-            system_prompt=self.system_prompt,
-            method="ollama",
-            model=self.model,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            stream=False,
-            base_url=self.base_url,
-            history=self.history,
-        )
+        reply = _post_chat(self._url, self._payload(prompt, stream=False), stream=False)
         assert isinstance(reply, str)
-        self.history.append({"role": "user", "content": prompt})
-        self.history.append({"role": "assistant", "content": reply})
+        self._remember(prompt, reply)
         return reply
 
+    def _remember(self, prompt: str, reply: str) -> None:
+        # History is validated here, once, so each request can send it as-is
+        self.history.append({"role": "user", "content": str(prompt)})
+        self.history.append({"role": "assistant", "content": str(reply)})
+        # Keep a sliding window of whole user/assistant pairs so the prompt stays bounded
+        if self.max_history_messages > 0:
+            excess = len(self.history) - self.max_history_messages
+            if excess > 0:
+                del self.history[:excess + (excess % 2)]
+
 
 def print_stream(generator: Iterable[str]):
     if TERMINAL_LOGGING:
@@ -1,25 +1,93 @@
 """Unified, colorized logger utilities with streaming support (ANSI codes)."""
 
+import logging
+import os
+import sys
 from typing import Iterable, Union, Optional
 from . import styles
 
 MODEL = "qwen2.5:0.5b" # Default
 
+
+def _color_enabled() -> bool:
+    if os.environ.get("FORCE_COLOR"):
+        return True
+    if os.environ.get("NO_COLOR") is not None:
+        return False
+    try:
+        return sys.stdout.isatty()
+    except Exception:
+        return False
+
+
+# Plain text when stdout is not a terminal (pipes, files, CI) or NO_COLOR is set
+_COLOR = _color_enabled()
+_RESET = styles.RESET if _COLOR else ""
+_BLUE = styles.BLUE if _COLOR else ""
+_GREEN = styles.GREEN if _COLOR else ""
+_RED = styles.RED if _COLOR else ""
+_WHITE = styles.WHITE if _COLOR else ""
+_GRAY = styles.GRAY if _COLOR else ""
+_ITALICS = styles.ITALICS if _COLOR else ""
+_BOLD = styles.BOLD if _COLOR else ""
+_UNDERLINE = styles.UNDERLINE if _COLOR else ""
+
+# Per-level line prefixes, built once; _LLM_PREFIX is rebuilt by set_model()
+_USER_PREFIX = f"{_RESET}{_BLUE}[{_WHITE}user{_BLUE}] > {_ITALICS}"
+_SYSTEM_PREFIX = f"{_RESET}{_GRAY}[>] "
+_ERROR_PREFIX = f"{_RESET}{_BOLD}{_UNDERLINE}{_RED}[!] "
+_LLM_PREFIX = f"{_RESET}{_GREEN}[{_WHITE}{MODEL}{_GREEN}] "
+
+# For callers that draw the user's line themselves (e.g. a live transcript redraw):
+# the same prefix user_log uses, and a line ending that resets and clears to end of line
+USER_PROMPT = _USER_PREFIX
+LINE_END = _RESET + ("\x1b[K" if _COLOR else "")
+
+
+_PREFIXES = {
+    "user": _USER_PREFIX,
+    "system": _SYSTEM_PREFIX,
+    "error": _ERROR_PREFIX,
+}
+
+
+class _PrefixFormatter(logging.Formatter):
+    """Render a record as its kind's coloured prefix, the message, then a reset."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        kind = getattr(record, "kind", None)
+        if kind == "llm":
+            return f"{_RESET}{_GREEN}{record.prefix}{record.getMessage()}{_RESET}"
+        if kind is None:
+            kind = "error" if record.levelno >= logging.ERROR else "system"
+        return _PREFIXES.get(kind, _SYSTEM_PREFIX) + record.getMessage() + _RESET
+
+
+# One handler owns stdout; its lock keeps lines from different threads whole and ordered
+_HANDLER = logging.StreamHandler(sys.stdout)
+_HANDLER.setFormatter(_PrefixFormatter())
+_LOGGER = logging.getLogger("gpt-oss-athon")
+_LOGGER.addHandler(_HANDLER)
+_LOGGER.setLevel(logging.INFO)
+_LOGGER.propagate = False
+
+
 def set_model(model: str):
-    global MODEL
+    global MODEL, _LLM_PREFIX
     MODEL = model
+    _LLM_PREFIX = f"{_RESET}{_GREEN}[{_WHITE}{MODEL}{_GREEN}] "
 
 
 def user_log(message: str):
-    print(f"{styles.RESET}{styles.BLUE}[{styles.WHITE}user{styles.BLUE}] > {styles.ITALICS}{message}{styles.RESET}")
+    _LOGGER.info(message, extra={"kind": "user"})
 
 
 def system_log(message: str):
-    print(f"{styles.RESET}{styles.GRAY}[>] {message}{styles.RESET}")
+    _LOGGER.info(message, extra={"kind": "system"})
 
 
 def error_log(message: str):
-    print(f"{styles.RESET}{styles.BOLD}{styles.UNDERLINE}{styles.RED}[!] {message}{styles.RESET}")
+    _LOGGER.error(message, extra={"kind": "error"})
 
 
 def llm_log(
@@ -30,17 +98,30 @@ def llm_log(
     newline: bool = True,
 ):
     if prefix is None:
-        prefix = f"{styles.RESET}{styles.GREEN}[{styles.WHITE}{MODEL}{styles.GREEN}] "
+        prefix = _LLM_PREFIX
     if not stream:
-        if isinstance(data, str):
-            print(f"{styles.RESET}{styles.GREEN}{prefix}{data}{styles.RESET}" if prefix else f"{styles.RESET}{styles.GREEN}{data}{styles.RESET}")
-        else:
-            text = "".join(data)
-            print(f"{styles.RESET}{styles.GREEN}{prefix}{text}{styles.RESET}" if prefix else f"{styles.RESET}{styles.GREEN}{text}{styles.RESET}")
+        text = data if isinstance(data, str) else "".join(data)
+        _LOGGER.info(text, extra={"kind": "llm", "prefix": prefix})
         return
 
-    print(f"{styles.RESET}{styles.GREEN}{prefix}{styles.RESET}", end="", flush=True)
-    for chunk in data:
-        print(f"{styles.RESET}{styles.GREEN}{chunk}{styles.RESET}", end="", flush=True)
-    if newline:
-        print()
\ No newline at end of file
+    # Write the reply straight to the handler's stream. The handler lock is taken per
+    # write, never across the wait for the next chunk, so other threads can still log
+    # while the model is generating. The colour is set once for the whole reply.
+    # Every chunk is flushed before control returns to the producer, otherwise text
+    # would sit invisible through a model stall; engine._coalesce already groups
+    # tokens, so this is one flush per batch rather than per token.
+    _write_stream(f"{_RESET}{_GREEN}{prefix}{_RESET}{_GREEN}")
+    try:
+        for chunk in data:
+            _write_stream(chunk)
+    finally:
+        _write_stream(_RESET + ("\n" if newline else ""))
+
+
+def _write_stream(text: str) -> None:
+    _HANDLER.acquire()
+    try:
+        _HANDLER.stream.write(text)
+        _HANDLER.stream.flush()
+    finally:
+        _HANDLER.release()